@@ -57,21 +57,19 @@ Follow these instructions carefully:
 5. Assign one analyst to each theme.
 """
 
+analysts_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", instruction),
+    ("human", "Generate the set of analysts."),
+  ]
+)
+analysts_chain = analysts_prompt | llm.with_structured_output(Perspectives)
+
 
 def generate_analysts(state: GenerateAnalystsState):
   """Create a set of AI analyst personas."""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", instruction),
-      ("human", "Generate the set of analysts."),
-    ]
-  )
-
-  structured_llm = llm.with_structured_output(Perspectives)
-  chain = prompt | structured_llm
-
-  perspectives = chain.invoke(
+  perspectives = analysts_chain.invoke(
     {
       "topic": state.topic,
       "max_analysts": state.max_analysts,
@@ -1,5 +1,7 @@
 from dotenv import load_dotenv
+from langchain_community.document_loaders import WikipediaLoader
 from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.runnables import RunnableLambda
 from langchain_openai import ChatOpenAI
 
 load_dotenv()
@@ -7,3 +9,7 @@ load_dotenv()
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
 web_seaerch = TavilySearchResults(max_results=3)
+
+wikipedia_search = RunnableLambda(
+  lambda query: WikipediaLoader(query=query, load_max_docs=2).load()
+)
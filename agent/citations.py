@@ -0,0 +1,66 @@
+import hashlib
+import re
+from urllib.parse import urldefrag
+
+from pydantic import BaseModel, Field
+
+
+class Source(BaseModel):
+  id: str = Field(..., description="Stable citation ID derived from the key")
+  key: str = Field(..., description="Link or document name listed under Sources")
+
+
+# Matches a citation such as [S1a2b3c] or a group such as [S1a2b3c, S4d5e6f],
+# with the spaces around it so dropped citations leave no gap
+citation_pattern = re.compile(
+  r"([ \t]*)\[(S[0-9a-f]{6}(?:\s*,\s*S[0-9a-f]{6})*)\]([ \t]*)", re.IGNORECASE
+)
+
+
+def cite(source: str, page: str | int | None = None) -> Source:
+  """Build the source for a retrieved document, keyed by its URL or path."""
+
+  key = urldefrag(source.strip()).url.rstrip("/")
+  if page not in (None, ""):
+    key = f"{key}, page {page}"
+  digest = hashlib.sha1(key.encode()).hexdigest()
+  return Source(id=f"S{digest[:6]}", key=key)
+
+
+def render_citations(text: str, sources: list[Source]) -> tuple[str, list[Source]]:
+  """\
+  Replace citation IDs in text with [1], [2], ... in order of first use.
+
+  Returns the renumbered text and the cited sources in that order. IDs are
+  matched case-insensitively, and IDs that do not belong to any retrieved
+  source are dropped from the text. IDs shared by sources with different keys
+  are ambiguous and dropped as well, so a citation never lists the wrong link.
+  """
+
+  index: dict[str, Source] = {}
+  collisions: set[str] = set()
+  for source in sources:
+    if index.setdefault(source.id, source).key != source.key:
+      collisions.add(source.id)
+  for source_id in collisions:
+    del index[source_id]
+  numbers: dict[str, int] = {}
+
+  def renumber(match: re.Match) -> str:
+    cited = []
+    for source_id in re.split(r"\s*,\s*", match.group(2)):
+      source_id = "S" + source_id[1:].lower()
+      if source_id not in index:
+        continue
+      number = numbers.setdefault(source_id, len(numbers) + 1)
+      if number not in cited:
+        cited.append(number)
+    if cited:
+      numbers_text = ", ".join(str(number) for number in cited)
+      return f"{match.group(1)}[{numbers_text}]{match.group(3)}"
+    # Keep one separator between the neighbouring words, none at a line start
+    at_line_start = match.start() == 0 or match.string[match.start() - 1] == "\n"
+    return "" if at_line_start else match.group(3)
+
+  text = citation_pattern.sub(renumber, text)
+  return text, [index[source_id] for source_id in numbers]
@@ -1,7 +1,6 @@
 import operator
 from typing import Annotated
 
-from langchain_community.document_loaders import WikipediaLoader
 from langchain_core.messages import AIMessage, AnyMessage, get_buffer_string
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.graph import END, START, StateGraph
@@ -9,7 +8,8 @@ from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 
 from agent.analysts import Analyst
-from agent.api import llm, web_seaerch
+from agent.api import llm, web_seaerch, wikipedia_search
+from agent.citations import Source, cite
 
 
 class InterviewState(BaseModel):
@@ -21,6 +21,9 @@ class InterviewState(BaseModel):
     2, description="The maximum number of turns in the interview"
   )
   context: Annotated[list[str], operator.add] = Field([], description="Source docs")
+  sources: Annotated[list[Source], operator.add] = Field(
+    [], description="Citation index of the source docs"
+  )
   interview: str = Field("", description="The interview transcript")
   sections: list[str] = Field(
     [], description="Final key we duplicate in outer state for Send() API"
@@ -53,20 +56,22 @@ When you are satisfied with your understanding, complete the interview with: "Th
 Remember to stay in character throughout your response, reflecting the persona and goals provided to you.
 """
 
+question_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", question_instruction),
+    MessagesPlaceholder("messages"),
+  ]
+)
+question_chain = question_prompt | llm
+
 
 def generate_question(state: InterviewState):
   """This is an analyst node that generates a question"""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", question_instruction),
-      MessagesPlaceholder("messages"),
-    ]
+  question = question_chain.invoke(
+    {"goals": state.analyst.persona, "messages": state.messages}
   )
 
-  chain = prompt | llm
-  question = chain.invoke({"goals": state.analyst.persona, "messages": state.messages})
-
   return {"messages": [question]}
 
 
@@ -82,44 +87,46 @@ Pay particular attention to the final question posed by the analyst.
 Convert this final question into a well-structured web search query
 """
 
+search_prompt = ChatPromptTemplate.from_messages(
+  [("system", search_instruction), MessagesPlaceholder("messages")]
+)
+search_query_chain = search_prompt | llm.with_structured_output(SearchQuery)
+
 
 def search_web(state: InterviewState):
   """Retrieve docs from  web search"""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [("system", search_instruction), MessagesPlaceholder("messages")]
-  )
-  chain = prompt | llm.with_structured_output(SearchQuery)
-  query = chain.invoke({"messages": state.messages})
+  query = search_query_chain.invoke({"messages": state.messages})
 
   docs = web_seaerch.invoke(query.search_query)  # type: ignore
 
+  sources = [cite(doc["url"]) for doc in docs]
   formatted_docs = "\n\n---\n\n".join(
-    [f'<Document href="{doc["url"]}"/>\n{doc["content"]}\n</Document>' for doc in docs]
+    [
+      f'<Document id="{source.id}" href="{source.key}"/>\n{doc["content"]}\n</Document>'
+      for source, doc in zip(sources, docs, strict=True)
+    ]
   )
 
-  return {"context": [formatted_docs]}
+  return {"context": [formatted_docs], "sources": sources}
 
 
 def search_wikipedia(state: InterviewState):
   """Retrieve docs from wikipedia"""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [("system", search_instruction), MessagesPlaceholder("messages")]
-  )
-  chain = prompt | llm.with_structured_output(SearchQuery)
-  query = chain.invoke({"messages": state.messages})
+  query = search_query_chain.invoke({"messages": state.messages})
 
-  docs = WikipediaLoader(query=query.search_query, load_max_docs=2).load()  # type: ignore
+  docs = wikipedia_search.invoke(query.search_query)  # type: ignore
 
+  sources = [cite(doc.metadata["source"], doc.metadata.get("page")) for doc in docs]
   formatted_docs = "\n\n---\n\n".join(
     [
-      f'<Document source="{doc.metadata["source"]}" page="{doc.metadata.get("page", "")}"/>\n{doc.page_content}\n</Document>'
-      for doc in docs
+      f'<Document id="{source.id}" source="{source.key}"/>\n{doc.page_content}\n</Document>'
+      for source, doc in zip(sources, docs, strict=True)
     ]
   )
 
-  return {"context": [formatted_docs]}
+  return {"context": [formatted_docs], "sources": sources}
 
 
 answer_instruction = """\
@@ -139,29 +146,23 @@ When answering questions, follow these guidelines:
         
 2. Do not introduce external information or make assumptions beyond what is explicitly stated in the context.
 
-3. The context contain sources at the topic of each individual document.
+3. The context contain sources at the topic of each individual document, each with an id attribute.
 
-4. Include these sources your answer next to any relevant statements. For example, for source # 1 use [1]. 
+4. Cite these sources in your answer next to any relevant statements using the id in brackets. For example, for <Document id="S1a2b3c" .../> use [S1a2b3c].
 
-5. List your sources in order at the bottom of your answer. [1] Source 1, [2] Source 2, etc
-        
-6. If the source is: <Document source="assistant/docs/llama3_1.pdf" page="7"/>' then just list: 
-        
-[1] assistant/docs/llama3_1.pdf, page 7 
-        
-And skip the addition of the brackets as well as the Document source preamble in your citation.
+5. Do not list your sources at the bottom of your answer.
 """
 
+answer_prompt = ChatPromptTemplate.from_messages(
+  [("system", answer_instruction), MessagesPlaceholder("messages")]
+)
+answer_chain = answer_prompt | llm
+
 
 def generate_answer(state: InterviewState):
   """This is an export node that generates an answer to the question"""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [("system", answer_instruction), MessagesPlaceholder("messages")]
-  )
-
-  chain = prompt | llm
-  answer = chain.invoke(
+  answer = answer_chain.invoke(
     {
       "goals": state.analyst.persona,
       "context": state.context,
@@ -208,7 +209,7 @@ You are an expert technical writer.
 Your task is to create a short, easily digestible section of a report based on a set of source documents.
 
 1. Analyze the content of the source documents: 
-- The name of each source document is at the start of the document, with the <Document tag.
+- The id of each source document is at the start of the document, with the <Document tag.
         
 2. Create a report structure using markdown formatting:
 - Use ## for the section title
@@ -217,7 +218,6 @@ Your task is to create a short, easily digestible section of a report based on a
 3. Write the report following this structure:
 a. Title (## header)
 b. Summary (### header)
-c. Sources (### header)
 
 4. Make your title engaging based upon the focus area of the analyst: 
 {focus}
@@ -225,50 +225,33 @@ c. Sources (### header)
 5. For the summary section:
 - Set up summary with general background / context related to the focus area of the analyst
 - Emphasize what is novel, interesting, or surprising about insights gathered from the interview
-- Create a numbered list of source documents, as you use them
 - Do not mention the names of interviewers or experts
 - Aim for approximately 400 words maximum
-- Use numbered sources in your report (e.g., [1], [2]) based on information from source documents
+- Cite source documents by their id in brackets (e.g., [S1a2b3c]) based on information from source documents
+- Do not renumber the ids and do not add a Sources section, it is generated from the ids
         
-6. In the Sources section:
-- Include all sources used in your report
-- Provide full links to relevant websites or specific document paths
-- Separate each source by a newline. Use two spaces at the end of each line to create a newline in Markdown.
-- It will look like:
-
-### Sources
-[1] Link or Document name
-[2] Link or Document name
-
-7. Be sure to combine sources. For example this is not correct:
-
-[3] https://ai.meta.com/blog/meta-llama-3-1/
-[4] https://ai.meta.com/blog/meta-llama-3-1/
-
-There should be no redundant sources. It should simply be:
-
-[3] https://ai.meta.com/blog/meta-llama-3-1/
-        
-8. Final review:
+6. Final review:
 - Ensure the report follows the required structure
 - Include no preamble before the title of the report
 - Check that all guidelines have been followed
 """
 
+section_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", section_writer_instruction),
+    ("human", "Use this source to write your section: {context}"),
+  ]
+)
+section_chain = section_prompt | llm
+
 
 def write_section(state: InterviewState):
   """Node to write a section of the report from the interview transcript and context"""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", section_writer_instruction),
-      ("human", "Use this source to write your section: {context}"),
-    ]
+  section = section_chain.invoke(
+    {"focus": state.analyst.description, "context": state.context}
   )
 
-  chain = prompt | llm
-  section = chain.invoke({"focus": state.analyst.description, "context": state.context})
-
   return {"sections": [section.content]}
 
 
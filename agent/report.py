@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
 
 from agent.api import llm
+from agent.citations import render_citations
 from agent.research import ResearchGraphState
 
 report_writer_instruction = """\
@@ -27,31 +28,28 @@ To format your report:
 3. Use no sub-heading. 
 4. Start your report with a single title header: ## Insights
 5. Do not mention any analyst names in your report.
-6. Preserve any citations in the memos, which will be annotated in brackets, for example [1] or [2].
-7. Create a final, consolidated list of sources and add to a Sources section with the `## Sources` header.
-8. List your sources in order and do not repeat.
-
-[1] Source 1
-[2] Source 2
+6. Preserve any citations in the memos exactly as written, which will be annotated in brackets, for example [S1a2b3c].
+7. Do not add a Sources section, it is generated from the citations.
 
 Here are the memos from your analysts to build your report from: 
 
 {context}
 """
 
+report_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", report_writer_instruction),
+    ("human", "Write a report based upon these memos."),
+  ]
+)
+report_chain = report_prompt | llm
+
 
 def write_report(state: ResearchGraphState):
   """Write content for the final report"""
 
   context = "\n\n".join([f"{section}" for section in state.sections])
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", report_writer_instruction),
-      ("human", "Write a report based upon these memos."),
-    ]
-  )
-  chain = prompt | llm
-  output = chain.invoke({"topic": state.topic, "context": context})
+  output = report_chain.invoke({"topic": state.topic, "context": context})
   return {"content": output.content}
 
 
@@ -79,19 +77,28 @@ For your conclusion, use ## Conclusion as the section header.
 Here are the sections to reflect on for writing: {context}
 """
 
+introduction_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", intoro_conclusion_instruction),
+    ("human", "Write the report introduction."),
+  ]
+)
+introduction_chain = introduction_prompt | llm
+
+conclusion_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", intoro_conclusion_instruction),
+    ("human", "Write the report conclusion."),
+  ]
+)
+conclusion_chain = conclusion_prompt | llm
+
 
 def write_introduction(state: ResearchGraphState):
   """Write the introduction for the final report"""
 
   context = "\n\n".join([f"{section}" for section in state.sections])
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", intoro_conclusion_instruction),
-      ("human", "Write the report introduction."),
-    ]
-  )
-  chain = prompt | llm
-  output = chain.invoke({"topic": state.topic, "context": context})
+  output = introduction_chain.invoke({"topic": state.topic, "context": context})
   return {"introduction": output.content}
 
 
@@ -99,14 +106,7 @@ def write_conclusion(state: ResearchGraphState):
   """Write the conclusion for the final report"""
 
   context = "\n\n".join([f"{section}" for section in state.sections])
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", intoro_conclusion_instruction),
-      ("human", "Write the report conclusion."),
-    ]
-  )
-  chain = prompt | llm
-  output = chain.invoke({"topic": state.topic, "context": context})
+  output = conclusion_chain.invoke({"topic": state.topic, "context": context})
   return {"conclusion": output.content}
 
 
@@ -119,19 +119,17 @@ def finalize_report(state: ResearchGraphState):
   content = state.content
   if content.startswith("## Insights"):
     content = content.replace("## Insights", "")
-  if "## Sources" in content:
-    try:
-      content, sources = content.split("## Sources")
-    except ValueError:
-      sources = None
-  else:
-    sources = None
+  # Sources are rendered below; drop any list the writer added anyway
+  content = content.split("## Sources", 1)[0]
 
   report = (
     state.introduction + "\n\n---\n\n" + content + "\n\n---\n\n" + state.conclusion
   )
-  if sources is not None:
-    report += "\n\n## Sources\n" + sources
+  report, sources = render_citations(report, state.sources)
+  if sources:
+    report += "\n\n## Sources\n" + "\n".join(
+      f"[{number}] {source.key}  " for number, source in enumerate(sources, 1)
+    )
 
   return {"final_report": report}
 
@@ -159,16 +157,17 @@ Please translate the following report into the appropriate language.
 
 """
 
+translate_prompt = ChatPromptTemplate.from_messages(
+  [
+    ("system", translate_instruction),
+    ("human", user_prompt),
+  ]
+)
+translate_chain = translate_prompt | llm
+
 
 def translate_report(state: ResearchGraphState):
   """Translate the report into Japanese."""
 
-  prompt = ChatPromptTemplate.from_messages(
-    [
-      ("system", translate_instruction),
-      ("human", user_prompt),
-    ]
-  )
-  chain = prompt | llm
-  output = chain.invoke({"topic": state.topic, "report": state.final_report})
+  output = translate_chain.invoke({"topic": state.topic, "report": state.final_report})
   return {"translated_report": output.content}
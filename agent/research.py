@@ -4,6 +4,7 @@ from typing import Annotated
 from pydantic import BaseModel, Field
 
 from agent.analysts import Analyst
+from agent.citations import Source
 
 
 class ResearchGraphState(BaseModel):
@@ -14,6 +15,9 @@ class ResearchGraphState(BaseModel):
   )
   analysts: list[Analyst] = Field([], description="Analysts asking questions")
   sections: Annotated[list[str], operator.add] = Field([], description="Send() API key")
+  sources: Annotated[list[Source], operator.add] = Field(
+    [], description="Citation index of the sources retrieved by all interviews"
+  )
   introduction: str = Field("", description="Introduction for the final report")
   content: str = Field("", description="Content for the final report")
   conclusion: str = Field("", description="Conclusion for the final report")
@@ -0,0 +1,442 @@
+import argparse
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from collections import deque
+from enum import StrEnum
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field, PrivateAttr
+
+from agent.graph import graph
+
+
+class JobStatus(StrEnum):
+  queued = "queued"
+  running = "running"
+  interrupted = "interrupted"
+  completed = "completed"
+  failed = "failed"
+
+
+ACTIVE_STATUSES = (JobStatus.queued, JobStatus.running)
+
+
+class Job(BaseModel):
+  id: str = Field(default_factory=lambda: uuid.uuid4().hex, description="Job ID")
+  tenant: str = Field(..., description="Tenant that owns the job")
+  topic: str = Field(..., description="Research topic")
+  max_analysts: int = Field(3, description="Maximum number of analysts to interview")
+  priority: int = Field(0, description="Higher priorities are dequeued first")
+  status: JobStatus = Field(JobStatus.queued, description="Current job status")
+  updated_at: float = Field(
+    default_factory=time.monotonic, exclude=True, description="Last status change"
+  )
+  next: list[str] = Field([], description="Nodes the graph is paused before")
+  error: str | None = Field(None, description="Error message if the job failed")
+  final_report: str = Field("", description="Final report")
+  translated_report: str = Field("", description="Translated report")
+  event_count: int = Field(0, description="Number of events published so far")
+  events: deque[dict[str, Any]] = Field(
+    default_factory=deque, exclude=True, description="Latest streamed results"
+  )
+  # Only this job's streams wait on it, so other tenants' events never wake them
+  _updated: asyncio.Condition = PrivateAttr(default_factory=asyncio.Condition)
+
+  @property
+  def thread_id(self) -> str:
+    # Namespaced so tenants never share a checkpoint thread
+    return f"{self.tenant}:{self.id}"
+
+  @property
+  def config(self) -> RunnableConfig:
+    return {"configurable": {"thread_id": self.thread_id}}
+
+  def set_status(self, status: JobStatus):
+    self.status = status
+    self.updated_at = time.monotonic()
+
+
+class ServiceError(Exception):
+  def __init__(self, status: int, message: str):
+    super().__init__(message)
+    self.status = status
+    self.message = message
+
+
+def _jsonable(value: Any) -> Any:
+  """Convert graph updates (pydantic models, messages, ...) into plain JSON."""
+
+  def default(obj: Any):
+    if hasattr(obj, "model_dump"):
+      return obj.model_dump()
+    return str(obj)
+
+  return json.loads(json.dumps(value, default=default))
+
+
+class ResearchService:
+  """\
+  Runs research jobs on a bounded pool of async workers.
+
+  All workers share the module level compiled `graph` and therefore its
+  checkpointer, so a job interrupted before `human_feedback` can be resumed
+  by any worker once feedback has been submitted.
+
+  Jobs that are finished or left waiting for feedback longer than `job_ttl`
+  seconds are evicted together with their checkpoint thread, and each job
+  keeps at most `max_events` of its latest events.
+  """
+
+  def __init__(
+    self,
+    num_workers: int = 4,
+    max_queue: int = 100,
+    max_jobs_per_tenant: int = 10,
+    max_events: int = 1000,
+    job_ttl: float = 3600,
+  ):
+    self.num_workers = num_workers
+    self.max_jobs_per_tenant = max_jobs_per_tenant
+    self.max_events = max_events
+    self.job_ttl = job_ttl
+    self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max_queue)
+    self._sequence = itertools.count()
+    self._jobs: dict[str, Job] = {}
+    self._tasks: list[asyncio.Task] = []
+
+  async def start(self):
+    self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+    self._tasks.append(asyncio.create_task(self._evictor()))
+
+  async def stop(self):
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._tasks = []
+
+  def get(self, tenant: str, job_id: str) -> Job:
+    job = self._jobs.get(job_id)
+    if job is None or job.tenant != tenant:
+      raise ServiceError(404, f"Job {job_id} not found")
+    return job
+
+  def list_jobs(self, tenant: str) -> list[Job]:
+    return [job for job in self._jobs.values() if job.tenant == tenant]
+
+  async def submit(
+    self, tenant: str, topic: str, max_analysts: int = 3, priority: int = 0
+  ) -> Job:
+    self._check_capacity(tenant)
+    job = Job(tenant=tenant, topic=topic, max_analysts=max_analysts, priority=priority)
+    job.events = deque(maxlen=self.max_events)
+    self._enqueue(job, feedback=None)
+    self._jobs[job.id] = job
+    await self._publish(job, {"type": "status", "status": job.status.value})
+    return job
+
+  async def submit_feedback(self, tenant: str, job_id: str, feedback: str) -> Job:
+    job = self.get(tenant, job_id)
+    if job.status != JobStatus.interrupted:
+      raise ServiceError(409, f"Job {job_id} is not waiting for feedback")
+    self._check_capacity(tenant)
+
+    # Claimed before any await so concurrent feedback gets a 409; the worker
+    # writes the feedback into the checkpoint before resuming the graph
+    self._enqueue(job, feedback=feedback)
+    job.set_status(JobStatus.queued)
+    await self._publish(job, {"type": "status", "status": job.status.value})
+    return job
+
+  def _check_capacity(self, tenant: str):
+    active = [job for job in self.list_jobs(tenant) if job.status in ACTIVE_STATUSES]
+    if len(active) >= self.max_jobs_per_tenant:
+      raise ServiceError(429, f"Tenant {tenant} has too many active jobs")
+
+  def _enqueue(self, job: Job, feedback: str | None):
+    try:
+      self._queue.put_nowait((-job.priority, next(self._sequence), job.id, feedback))
+    except asyncio.QueueFull:
+      raise ServiceError(503, "Job queue is full") from None
+
+  async def _publish(self, job: Job, event: dict[str, Any]):
+    job.events.append({"seq": job.event_count, **_jsonable(event)})
+    job.event_count += 1
+    async with job._updated:
+      job._updated.notify_all()
+
+  async def _worker(self):
+    while True:
+      _, _, job_id, feedback = await self._queue.get()
+      job = self._jobs[job_id]
+      try:
+        await self._run(job, feedback)
+      except Exception as e:
+        job.set_status(JobStatus.failed)
+        job.error = repr(e)
+      finally:
+        self._queue.task_done()
+      await self._publish(job, {"type": "status", "status": job.status.value})
+
+  async def _run(self, job: Job, feedback: str | None):
+    job.set_status(JobStatus.running)
+    await self._publish(job, {"type": "status", "status": job.status.value})
+
+    if feedback is None:
+      inputs = {"topic": job.topic, "max_analysts": job.max_analysts}
+    else:
+      inputs = None
+      await graph.aupdate_state(
+        job.config, {"human_feedback_for_analysts": feedback}, as_node="human_feedback"
+      )
+    async for update in graph.astream(inputs, job.config, stream_mode="updates"):
+      for node, data in update.items():
+        await self._publish(job, {"type": "update", "node": node, "data": data})
+
+    state = await graph.aget_state(job.config)
+    job.next = list(state.next)
+    if state.next:
+      job.set_status(JobStatus.interrupted)
+    else:
+      job.set_status(JobStatus.completed)
+      job.final_report = state.values.get("final_report", "")
+      job.translated_report = state.values.get("translated_report", "")
+
+  async def _evictor(self):
+    while True:
+      await asyncio.sleep(max(min(self.job_ttl, 60), 1))
+      await self.evict_expired()
+
+  async def evict_expired(self):
+    """Drop idle jobs and their checkpoint threads once `job_ttl` has passed."""
+
+    deadline = time.monotonic() - self.job_ttl
+    expired = [
+      job
+      for job in self._jobs.values()
+      if job.status not in ACTIVE_STATUSES and job.updated_at < deadline
+    ]
+    # Unlisted before awaiting, so feedback can no longer claim them
+    for job in expired:
+      del self._jobs[job.id]
+    for job in expired:
+      await graph.checkpointer.adelete_thread(job.thread_id)  # type: ignore
+
+  async def stream(self, job: Job, after: int = 0):
+    """Yield events until the job stops running (finished or waiting for input)."""
+
+    sent = after
+    while True:
+      async with job._updated:
+        await job._updated.wait_for(
+          lambda sent=sent: job.event_count > sent or job.status not in ACTIVE_STATUSES
+        )
+      while sent < job.event_count:
+        # Events older than the buffer were dropped, skip ahead to the oldest
+        first = job.event_count - len(job.events)
+        sent = max(sent, first)
+        yield job.events[sent - first]
+        sent += 1
+      if job.status not in ACTIVE_STATUSES:
+        return
+
+  def stats(self) -> dict[str, Any]:
+    counts = {status.value: 0 for status in JobStatus}
+    for job in self._jobs.values():
+      counts[job.status.value] += 1
+    return {"workers": self.num_workers, "queued": self._queue.qsize(), **counts}
+
+
+STATUS_REASONS = {
+  200: "OK",
+  202: "Accepted",
+  400: "Bad Request",
+  404: "Not Found",
+  405: "Method Not Allowed",
+  409: "Conflict",
+  413: "Content Too Large",
+  429: "Too Many Requests",
+  500: "Internal Server Error",
+  503: "Service Unavailable",
+}
+
+
+class ResearchServer:
+  """\
+  Minimal JSON over HTTP/1.1 front end for `ResearchService`.
+
+  Routes (the tenant is taken from the `X-Tenant-ID` header):
+    GET  /healthz                 queue and worker statistics
+    POST /jobs                    {"topic", "max_analysts"?, "priority"?}
+    GET  /jobs                    jobs of the tenant
+    GET  /jobs/{id}               job status and results
+    GET  /jobs/{id}/events?after  partial results recorded so far
+    GET  /jobs/{id}/stream?after  partial results as NDJSON until the job pauses
+    POST /jobs/{id}/feedback      {"feedback"} answers the human_feedback interrupt
+  """
+
+  def __init__(
+    self,
+    service: ResearchService,
+    read_timeout: float = 10,
+    max_body_size: int = 64 * 1024,
+  ):
+    self.service = service
+    self.read_timeout = read_timeout
+    self.max_body_size = max_body_size
+
+  async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+    return await asyncio.start_server(self._handle, host, port)
+
+  async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+      method, path, query, headers, body = await asyncio.wait_for(
+        self._read_request(reader), self.read_timeout
+      )
+      tenant = headers.get("x-tenant-id", "default")
+      await self._route(writer, method, path, query, tenant, body)
+    except ServiceError as e:
+      self._write_json(writer, e.status, {"error": e.message})
+    except (ValueError, KeyError, TypeError) as e:
+      self._write_json(writer, 400, {"error": str(e)})
+    except (TimeoutError, asyncio.IncompleteReadError):
+      self._write_json(writer, 400, {"error": "Incomplete request"})
+    except Exception as e:
+      self._write_json(writer, 500, {"error": repr(e)})
+    finally:
+      try:
+        await writer.drain()
+      except ConnectionError:
+        pass
+      writer.close()
+
+  async def _read_request(self, reader: asyncio.StreamReader):
+    request_line = (await reader.readline()).decode("latin-1")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+      name, _, value = line.decode("latin-1").partition(":")
+      headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > self.max_body_size:
+      raise ServiceError(413, f"Request body exceeds {self.max_body_size} bytes")
+    body = json.loads(await reader.readexactly(length)) if length else {}
+    if not isinstance(body, dict):
+      raise ServiceError(400, "Request body must be a JSON object")
+    url = urlsplit(target)
+    query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+    return method.upper(), url.path.strip("/").split("/"), query, headers, body
+
+  async def _route(self, writer, method, path, query, tenant, body):
+    service = self.service
+    match (method, path):
+      case ("GET", ["healthz"]):
+        self._write_json(writer, 200, service.stats())
+      case ("POST", ["jobs"]):
+        job = await service.submit(
+          tenant,
+          body["topic"],
+          max_analysts=int(body.get("max_analysts", 3)),
+          priority=int(body.get("priority", 0)),
+        )
+        self._write_json(writer, 202, job.model_dump(mode="json"))
+      case ("GET", ["jobs"]):
+        jobs = [job.model_dump(mode="json") for job in service.list_jobs(tenant)]
+        self._write_json(writer, 200, {"jobs": jobs})
+      case ("GET", ["jobs", job_id]):
+        job = service.get(tenant, job_id)
+        self._write_json(writer, 200, job.model_dump(mode="json"))
+      case ("GET", ["jobs", job_id, "events"]):
+        job = service.get(tenant, job_id)
+        after = int(query.get("after", 0))
+        events = [event for event in job.events if event["seq"] >= after]
+        self._write_json(writer, 200, {"status": job.status.value, "events": events})
+      case ("GET", ["jobs", job_id, "stream"]):
+        job = service.get(tenant, job_id)
+        self._write_head(writer, 200, "application/x-ndjson")
+        # Headers are sent, so errors must not start a second response
+        try:
+          async for event in service.stream(job, int(query.get("after", 0))):
+            writer.write(json.dumps(event).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+          pass
+        except Exception as e:
+          writer.write(json.dumps({"type": "error", "error": repr(e)}).encode() + b"\n")
+      case ("POST", ["jobs", job_id, "feedback"]):
+        job = await service.submit_feedback(tenant, job_id, body["feedback"])
+        self._write_json(writer, 202, job.model_dump(mode="json"))
+      case ("GET" | "POST", _):
+        raise ServiceError(404, f"No route for /{'/'.join(path)}")
+      case _:
+        raise ServiceError(405, f"Method {method} not allowed")
+
+  def _write_head(self, writer: asyncio.StreamWriter, status: int, content_type: str):
+    writer.write(
+      f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}\r\n"
+      f"Content-Type: {content_type}\r\n"
+      "Connection: close\r\n\r\n".encode("latin-1")
+    )
+
+  def _write_json(self, writer: asyncio.StreamWriter, status: int, payload: Any):
+    self._write_head(writer, status, "application/json")
+    writer.write(json.dumps(payload).encode())
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Serve research jobs over local HTTP")
+  parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address")
+  parser.add_argument("--port", type=int, default=8000, help="Bind port")
+  parser.add_argument(
+    "--workers", type=int, default=4, help="Number of concurrent graph runs"
+  )
+  parser.add_argument(
+    "--max-queue", type=int, default=100, help="Maximum number of queued jobs"
+  )
+  parser.add_argument(
+    "--max-jobs-per-tenant",
+    type=int,
+    default=10,
+    help="Maximum number of queued or running jobs per tenant",
+  )
+  parser.add_argument(
+    "--max-events", type=int, default=1000, help="Events kept per job for streaming"
+  )
+  parser.add_argument(
+    "--job-ttl",
+    type=float,
+    default=3600,
+    help="Seconds before finished or idle interrupted jobs are evicted",
+  )
+  return parser.parse_args()
+
+
+async def serve(args: argparse.Namespace):
+  service = ResearchService(
+    args.workers,
+    args.max_queue,
+    args.max_jobs_per_tenant,
+    max_events=args.max_events,
+    job_ttl=args.job_ttl,
+  )
+  await service.start()
+  server = await ResearchServer(service).serve(args.host, args.port)
+  print(f"Serving research jobs on http://{args.host}:{args.port}")
+  try:
+    async with server:
+      await server.serve_forever()
+  finally:
+    await service.stop()
+
+
+def run():
+  asyncio.run(serve(parse_args()))
+
+
+if __name__ == "__main__":
+  run()
@@ -0,0 +1,173 @@
+"""\
+Micro-benchmark of the per-node prompt and chain overhead.
+
+"before" rebuilds the prompt template and chain on every call, as the nodes
+used to. "after" uses the chains compiled once at module import. Both format
+the prompt with the real `ChatOpenAI` model and structured output schemas, but
+stop short of the network call, so the numbers are node-local CPU time only.
+"""
+
+import argparse
+import os
+import time
+
+os.environ["DRAW_GRAPH"] = "false"
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API_KEY", "stub")
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from agent import analysts, interview, report
+from agent.api import llm
+
+messages = [
+  HumanMessage(content="So you said you were writing an article on LangGraph"),
+  AIMessage(content="Hi, I'm an analyst. What makes LangGraph different?"),
+]
+report_inputs = {"topic": "LangGraph", "context": "## Section\nBody [S1a2b3c]"}
+
+# node name -> (rebuild chain as before, compiled chain, prompt inputs)
+NODES = {
+  "generate_analysts": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [
+          ("system", analysts.instruction),
+          ("human", "Generate the set of analysts."),
+        ]
+      )
+      | llm.with_structured_output(analysts.Perspectives)
+    ),
+    analysts.analysts_chain,
+    {"topic": "LangGraph", "max_analysts": 3, "human_feedback_for_analysts": ""},
+  ),
+  "generate_question": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [("system", interview.question_instruction), MessagesPlaceholder("messages")]
+      )
+      | llm
+    ),
+    interview.question_chain,
+    {"goals": "Persona", "messages": messages},
+  ),
+  "search_web / search_wikipedia": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [("system", interview.search_instruction), MessagesPlaceholder("messages")]
+      )
+      | llm.with_structured_output(interview.SearchQuery)
+    ),
+    interview.search_query_chain,
+    {"messages": messages},
+  ),
+  "generate_answer": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [("system", interview.answer_instruction), MessagesPlaceholder("messages")]
+      )
+      | llm
+    ),
+    interview.answer_chain,
+    {"goals": "Persona", "context": ["<Document/>"], "messages": messages},
+  ),
+  "write_section": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [
+          ("system", interview.section_writer_instruction),
+          ("human", "Use this source to write your section: {context}"),
+        ]
+      )
+      | llm
+    ),
+    interview.section_chain,
+    {"focus": "Focus", "context": ["<Document/>"]},
+  ),
+  "write_report": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [
+          ("system", report.report_writer_instruction),
+          ("human", "Write a report based upon these memos."),
+        ]
+      )
+      | llm
+    ),
+    report.report_chain,
+    report_inputs,
+  ),
+  "write_introduction": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [
+          ("system", report.intoro_conclusion_instruction),
+          ("human", "Write the report introduction."),
+        ]
+      )
+      | llm
+    ),
+    report.introduction_chain,
+    report_inputs,
+  ),
+  "write_conclusion": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [
+          ("system", report.intoro_conclusion_instruction),
+          ("human", "Write the report conclusion."),
+        ]
+      )
+      | llm
+    ),
+    report.conclusion_chain,
+    report_inputs,
+  ),
+  "translate_report": (
+    lambda: (
+      ChatPromptTemplate.from_messages(
+        [("system", report.translate_instruction), ("human", report.user_prompt)]
+      )
+      | llm
+    ),
+    report.translate_chain,
+    {"topic": "LangGraph", "report": "# Report"},
+  ),
+}
+
+
+def measure(fn, iterations: int) -> float:
+  """Mean microseconds per call."""
+
+  started = time.perf_counter()
+  for _ in range(iterations):
+    fn()
+  return (time.perf_counter() - started) / iterations * 1e6
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Benchmark per-node chain overhead")
+  parser.add_argument(
+    "--iterations", type=int, default=500, help="Calls per node and variant"
+  )
+  return parser.parse_args()
+
+
+def run():
+  args = parse_args()
+  print(f"{'node':<32}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+  for name, (rebuild, chain, inputs) in NODES.items():
+    # chain.first is the prompt; everything after it is the model call
+    before = measure(
+      lambda rebuild=rebuild, inputs=inputs: rebuild().first.invoke(inputs),
+      args.iterations,
+    )
+    after = measure(
+      lambda chain=chain, inputs=inputs: chain.first.invoke(inputs), args.iterations
+    )
+    print(f"{name:<32}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+  run()
@@ -0,0 +1,162 @@
+"""\
+Load test for the research server using local stub backends.
+
+The LLM, web search and Wikipedia backends in `agent.api` are replaced with
+stubs that sleep for a fixed latency, so the run measures queueing and
+scheduling overhead of the server without any network access or API keys.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+# Must be configured before `agent.graph` is imported
+os.environ["DRAW_GRAPH"] = "false"
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+os.environ.setdefault("TAVILY_API_KEY", "stub")
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+import agent.api
+from agent.citations import cite
+
+STRUCTURED_OUTPUTS = {
+  "Perspectives": {
+    "analysts": [
+      {
+        "affiliation": f"Stub Institute {i}",
+        "name": f"Analyst {i}",
+        "role": "Researcher",
+        "description": f"Focuses on theme {i}.",
+      }
+      for i in range(2)
+    ]
+  },
+  "SearchQuery": {"search_query": "stub query"},
+}
+
+
+class StubChatModel(BaseChatModel):
+  latency: float = 0.05
+
+  @property
+  def _llm_type(self) -> str:
+    return "stub"
+
+  def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+    time.sleep(self.latency)
+    source = cite("https://example.com/0")
+    message = AIMessage(content=f"Stub response citing [{source.id}].")
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+  def with_structured_output(self, schema, **kwargs):  # type: ignore
+    def invoke(_):
+      time.sleep(self.latency)
+      return schema.model_validate(STRUCTURED_OUTPUTS[schema.__name__])
+
+    return RunnableLambda(invoke)
+
+
+def install_stubs(latency: float):
+  def web_search(query: str):
+    time.sleep(latency)
+    return [{"url": f"https://example.com/{i}", "content": query} for i in range(3)]
+
+  def wikipedia_search(query: str):
+    time.sleep(latency)
+    return [Document(page_content=query, metadata={"source": "https://wiki/stub"})]
+
+  agent.api.llm = StubChatModel(latency=latency)
+  agent.api.web_seaerch = RunnableLambda(web_search)
+  agent.api.wikipedia_search = RunnableLambda(wikipedia_search)
+
+
+async def request(port: int, method: str, path: str, tenant: str, body=None):
+  reader, writer = await asyncio.open_connection("127.0.0.1", port)
+  payload = json.dumps(body).encode() if body is not None else b""
+  writer.write(
+    f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nX-Tenant-ID: {tenant}\r\n"
+    f"Content-Length: {len(payload)}\r\n\r\n".encode()
+    + payload
+  )
+  await writer.drain()
+  response = await reader.read()
+  writer.close()
+  head, _, content = response.partition(b"\r\n\r\n")
+  status = int(head.split(b" ", 2)[1])
+  return status, content
+
+
+async def run_job(port: int, tenant: str, index: int) -> float:
+  started = time.perf_counter()
+  status, content = await request(
+    port, "POST", "/jobs", tenant, {"topic": f"Topic {index}", "priority": index % 3}
+  )
+  if status != 202:
+    raise RuntimeError(f"Submit failed with {status}: {content.decode()}")
+  job_id = json.loads(content)["id"]
+
+  # The stream ends when the graph pauses before human_feedback
+  await request(port, "GET", f"/jobs/{job_id}/stream", tenant)
+  await request(
+    port, "POST", f"/jobs/{job_id}/feedback", tenant, {"feedback": "approve"}
+  )
+  await request(port, "GET", f"/jobs/{job_id}/stream", tenant)
+
+  _, content = await request(port, "GET", f"/jobs/{job_id}", tenant)
+  job = json.loads(content)
+  if job["status"] != "completed":
+    raise RuntimeError(f"Job {job_id} ended as {job['status']}: {job['error']}")
+  return time.perf_counter() - started
+
+
+def parse_args():
+  parser = argparse.ArgumentParser(description="Load test the research server")
+  parser.add_argument("--jobs", type=int, default=20, help="Number of jobs")
+  parser.add_argument("--tenants", type=int, default=4, help="Number of tenants")
+  parser.add_argument("--workers", type=int, default=4, help="Server workers")
+  parser.add_argument(
+    "--latency", type=float, default=0.05, help="Stub backend latency in seconds"
+  )
+  parser.add_argument("--port", type=int, default=8765, help="Server port")
+  return parser.parse_args()
+
+
+async def main(args: argparse.Namespace):
+  install_stubs(args.latency)
+  from agent.server import ResearchServer, ResearchService
+
+  service = ResearchService(
+    args.workers, max_queue=args.jobs * 2, max_jobs_per_tenant=args.jobs
+  )
+  await service.start()
+  server = await ResearchServer(service).serve(port=args.port)
+
+  started = time.perf_counter()
+  latencies = await asyncio.gather(
+    *[run_job(args.port, f"tenant-{i % args.tenants}", i) for i in range(args.jobs)]
+  )
+  elapsed = time.perf_counter() - started
+
+  server.close()
+  await server.wait_closed()
+  await service.stop()
+
+  latencies = sorted(latencies)
+  print(f"Jobs: {args.jobs}  Tenants: {args.tenants}  Workers: {args.workers}")
+  print(f"Elapsed: {elapsed:.2f}s  Throughput: {args.jobs / elapsed:.2f} jobs/s")
+  print(f"Latency p50: {statistics.median(latencies):.2f}s", end="  ")
+  print(f"p95: {latencies[int(0.95 * (len(latencies) - 1))]:.2f}s", end="  ")
+  print(f"max: {latencies[-1]:.2f}s")
+
+
+if __name__ == "__main__":
+  asyncio.run(main(parse_args()))
@@ -0,0 +1,4 @@
+import load_test
+
+# Swap in the local stub backends before any test imports `agent.graph`
+load_test.install_stubs(latency=0)
@@ -0,0 +1,77 @@
+from agent.citations import Source, cite, render_citations
+
+
+def test_cite_normalizes_urls():
+  source = cite(" https://example.com/post/#section ")
+
+  assert source.key == "https://example.com/post"
+  assert source == cite("https://example.com/post")
+  assert source.id.startswith("S") and len(source.id) == 7
+
+
+def test_cite_keys_pages():
+  paged = cite("docs/llama3_1.pdf", page=7)
+
+  assert paged.key == "docs/llama3_1.pdf, page 7"
+  assert paged.id != cite("docs/llama3_1.pdf").id
+  assert cite("https://en.wikipedia.org/wiki/LangGraph", page="").key == (
+    "https://en.wikipedia.org/wiki/LangGraph"
+  )
+
+
+def test_render_citations_numbers_in_order_of_first_use():
+  a, b = cite("https://example.com/a"), cite("https://example.com/b")
+
+  text, sources = render_citations(
+    f"One [{b.id}]. Two [{a.id}]. Three [{b.id}].", [a, b]
+  )
+
+  assert text == "One [1]. Two [2]. Three [1]."
+  assert sources == [b, a]
+
+
+def test_render_citations_merges_groups():
+  a, b = cite("https://example.com/a"), cite("https://example.com/b")
+
+  text, sources = render_citations(f"Both [{a.id}, {b.id},{a.id}].", [a, b, a])
+
+  assert text == "Both [1, 2]."
+  assert sources == [a, b]
+
+
+def test_render_citations_ignores_case():
+  a = cite("https://example.com/a")
+
+  text, sources = render_citations(f"Loud [{a.id.upper()}].", [a])
+
+  assert text == "Loud [1]."
+  assert sources == [a]
+
+
+def test_render_citations_drops_unknown_ids():
+  a = cite("https://example.com/a")
+
+  text, sources = render_citations(
+    f"Known [{a.id}], unknown [S000000].\n[SFFFFFF, S000000] Mixed [S000000, {a.id}].",
+    [a],
+  )
+
+  assert text == "Known [1], unknown.\nMixed [1]."
+  assert sources == [a]
+
+
+def test_render_citations_drops_unknown_ids_between_words():
+  text, _ = render_citations("Before [S000000] after, tight[S000000] end.", [])
+
+  assert text == "Before after, tight end."
+
+
+def test_render_citations_drops_colliding_ids():
+  a = Source(id="S000000", key="https://example.com/a")
+  b = Source(id="S000000", key="https://example.com/b")
+  c = cite("https://example.com/c")
+
+  text, sources = render_citations(f"Ambiguous [S000000]. Fine [{c.id}].", [a, a, b, c])
+
+  assert text == "Ambiguous. Fine [1]."
+  assert sources == [c]
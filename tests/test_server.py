@@ -0,0 +1,168 @@
+import asyncio
+import contextlib
+import json
+
+import pytest
+
+from agent.graph import graph
+from agent.server import (
+  JobStatus,
+  ResearchServer,
+  ResearchService,
+  ServiceError,
+)
+
+
+@contextlib.asynccontextmanager
+async def running_service(**kwargs):
+  service = ResearchService(**kwargs)
+  await service.start()
+  try:
+    yield service
+  finally:
+    await service.stop()
+
+
+async def wait_until_paused(service: ResearchService, job):
+  async for _ in service.stream(job, job.event_count):
+    pass
+
+
+async def raw_request(port: int, data: bytes) -> tuple[int, dict]:
+  reader, writer = await asyncio.open_connection("127.0.0.1", port)
+  writer.write(data)
+  await writer.drain()
+  response = await reader.read()
+  writer.close()
+  head, _, content = response.partition(b"\r\n\r\n")
+  return int(head.split(b" ", 2)[1]), json.loads(content)
+
+
+def request(path: str, tenant: str = "a", body: bytes = b"", method: str = "POST"):
+  return (
+    f"{method} {path} HTTP/1.1\r\nX-Tenant-ID: {tenant}\r\n"
+    f"Content-Length: {len(body)}\r\n\r\n".encode()
+    + body
+  )
+
+
+def test_concurrent_feedback_resumes_once():
+  async def scenario():
+    async with running_service(num_workers=2) as service:
+      job = await service.submit("a", "topic")
+      await wait_until_paused(service, job)
+      assert job.status == JobStatus.interrupted
+
+      results = await asyncio.gather(
+        service.submit_feedback("a", job.id, "approve"),
+        service.submit_feedback("a", job.id, "approve"),
+        return_exceptions=True,
+      )
+      errors = [result for result in results if isinstance(result, ServiceError)]
+      assert [error.status for error in errors] == [409]
+
+      await wait_until_paused(service, job)
+      assert job.status == JobStatus.completed
+      statuses = [event.get("status") for event in job.events]
+      assert statuses.count("completed") == 1
+
+  asyncio.run(scenario())
+
+
+def test_tenant_cap_applies_to_submit_and_resume():
+  async def scenario():
+    async with running_service(max_jobs_per_tenant=1) as service:
+      parked = await service.submit("a", "topic")
+      await wait_until_paused(service, parked)
+      await service.submit("a", "other")
+
+      with pytest.raises(ServiceError) as submit_error:
+        await service.submit("a", "third")
+      with pytest.raises(ServiceError) as resume_error:
+        await service.submit_feedback("a", parked.id, "approve")
+      assert submit_error.value.status == 429
+      assert resume_error.value.status == 429
+      assert parked.status == JobStatus.interrupted
+
+  asyncio.run(scenario())
+
+
+def test_feedback_other_than_approve_regenerates_analysts():
+  async def scenario():
+    async with running_service() as service:
+      job = await service.submit("a", "topic")
+      await wait_until_paused(service, job)
+      seen = job.event_count
+
+      await service.submit_feedback("a", job.id, "Add a historian")
+      await wait_until_paused(service, job)
+
+      nodes = [event.get("node") for event in job.events if event["seq"] >= seen]
+      assert "create_analysts" in nodes
+      assert "conduct_interview" not in nodes
+      assert job.status == JobStatus.interrupted
+      assert job.next == ["human_feedback"]
+
+  asyncio.run(scenario())
+
+
+def test_stream_skips_events_dropped_from_buffer():
+  async def scenario():
+    async with running_service(max_events=3) as service:
+      job = await service.submit("a", "topic")
+      await wait_until_paused(service, job)
+      assert job.event_count > 3
+
+      events = [event async for event in service.stream(job, after=0)]
+      assert [event["seq"] for event in events] == list(
+        range(job.event_count - 3, job.event_count)
+      )
+
+  asyncio.run(scenario())
+
+
+def test_evict_expired_drops_job_and_checkpoint():
+  async def scenario():
+    async with running_service(job_ttl=3600) as service:
+      job = await service.submit("a", "topic")
+      await wait_until_paused(service, job)
+      assert await graph.checkpointer.aget_tuple(job.config) is not None
+
+      await service.evict_expired()
+      assert service.get("a", job.id) is job
+
+      service.job_ttl = 0
+      await service.evict_expired()
+      with pytest.raises(ServiceError):
+        service.get("a", job.id)
+      assert await graph.checkpointer.aget_tuple(job.config) is None
+
+  asyncio.run(scenario())
+
+
+def test_http_rejects_other_tenants_and_bad_requests():
+  async def scenario():
+    async with running_service() as service:
+      server = await ResearchServer(
+        service, read_timeout=0.2, max_body_size=1024
+      ).serve(port=0)
+      port = server.sockets[0].getsockname()[1]
+      try:
+        status, job = await raw_request(
+          port, request("/jobs", body=b'{"topic": "topic"}')
+        )
+        assert status == 202
+
+        other = request(f"/jobs/{job['id']}", tenant="b", method="GET")
+        assert (await raw_request(port, other))[0] == 404
+        assert (await raw_request(port, request("/jobs", body=b"[]")))[0] == 400
+
+        too_large = request("/jobs", body=b"{}").replace(b"2\r\n", b"4096\r\n")
+        assert (await raw_request(port, too_large))[0] == 413
+        truncated = request("/jobs", body=b"{}").replace(b"2\r\n", b"20\r\n")
+        assert (await raw_request(port, truncated))[0] == 400
+      finally:
+        server.close()
+        await server.wait_closed()
+
+  asyncio.run(scenario())